@@ -1,16 +1,23 @@
 import streamlit as st
-import pandas as pd
 import numpy as np
-import time
 import random
 from datetime import datetime, UTC
-import plotly.express as px
-import io, qrcode
-# 📱 Responsive Layout Helper (Do NOT remove any of your existing code)
-import streamlit as st
+import plotly.graph_objects as go
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import io, segno
 
-st.set_page_config(page_title="Smart Adaptive Camouflage Suit", layout="wide", page_icon="🪖")
+# --------------------------------------------------
+# PAGE CONFIGURATION
+# --------------------------------------------------
+st.set_page_config(
+    page_title="Smart Adaptive Camouflage Suit",
+    page_icon="🪖",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
 
+# 📱 Responsive Layout Helper
 # --- Responsive CSS for Mobile Optimisation ---
 st.markdown("""
 <style>
@@ -66,15 +73,6 @@ body, .block-container {
 }
 </style>
 """, unsafe_allow_html=True)
-# --------------------------------------------------
-# PAGE CONFIGURATION
-# --------------------------------------------------
-st.set_page_config(
-    page_title="Smart Adaptive Camouflage Suit",
-    page_icon="🪖",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
 
 st.markdown("""
     <style>
@@ -104,8 +102,25 @@ st.markdown("""
 # --------------------------------------------------
 # INITIALISE STATE
 # --------------------------------------------------
+HISTORY_LEN = 300
+HISTORY_MODES = ("Cool Mode", "Heat Mode", "Stealth Mode", "Alert Mode")
+HISTORY_MODE_CODES = {mode: code for code, mode in enumerate(HISTORY_MODES)}
+
+# Compact fixed-point storage, exact for the simulator's rounding: temp in hundredths of °C,
+# light in thousandths, mode as an index into HISTORY_MODES
+HISTORY_DTYPE = np.dtype([
+    ("timestamp", "datetime64[us]"),
+    ("temp", "i2"),
+    ("heart", "u1"),
+    ("light", "u2"),
+    ("mode", "u1"),
+])
+
+# Fixed-size ring buffer (timestamps are naive UTC): history_idx counts every reading ever written,
+# the slot for the next one is history_idx % HISTORY_LEN
 if "history" not in st.session_state:
-    st.session_state.history = pd.DataFrame(columns=["timestamp", "temp", "heart", "light", "mode"])
+    st.session_state.history = np.zeros(HISTORY_LEN, dtype=HISTORY_DTYPE)
+    st.session_state.history_idx = 0
 
 # --------------------------------------------------
 # FUNCTIONS
@@ -155,36 +170,66 @@ def simulate_reading(preset, terrain, oxygen, radiation, space_mode):
     return temp, heart, light, mode
 
 
+def record_reading(temp, heart, light, mode):
+    idx = st.session_state.history_idx
+    st.session_state.history[idx % HISTORY_LEN] = (
+        datetime.now(UTC).replace(tzinfo=None), round(temp * 100), heart, round(light * 1000), HISTORY_MODE_CODES[mode]
+    )
+    st.session_state.history_idx = idx + 1
+
+
+def history_view():
+    """Return the buffered readings in chronological order."""
+    buf, idx = st.session_state.history, st.session_state.history_idx
+    if idx <= HISTORY_LEN:
+        return buf[:idx]
+    return np.roll(buf, -(idx % HISTORY_LEN))
+
+
+TERRAIN_GRADIENTS = {
+    "Forest": ("#184d27", "#0a2e17"),      # deep green tones
+    "Rock": ("#5c5c5c", "#2e2e2e"),        # natural rocky greys
+    "Desert": ("#cba35b", "#a18445"),      # sandy warm tones
+    "Urban": ("#4f4f4f", "#1f1f1f"),       # concrete realism
+    "Space": ("#0b0b2b", "#1c1c6b")        # deep navy cosmic
+}
+DEFAULT_GRADIENT = ("#0aa1dd", "#0099cc")
+
+MODE_COLOURS = {
+    "Cool Mode": ("#4ca1af", "#2c3e50"),        # calm blue-steel
+    "Heat Mode": ("#ff914d", "#ff5e00"),        # realistic heat orange
+    "Stealth Mode": ("#1e3c1f", "#2a5725"),     # dark camo green
+    "Alert Mode": ("#2b0000", "#ff0000"),       # darker, scarier red
+}
+DEFAULT_MODE_COLOURS = ("#4ca1af", "#2c3e50")
+
+
 def get_gradient_by_terrain(terrain):
-    terrains = {
-        "Forest": ("#184d27", "#0a2e17"),      # deep green tones
-        "Rock": ("#5c5c5c", "#2e2e2e"),        # natural rocky greys
-        "Desert": ("#cba35b", "#a18445"),      # sandy warm tones
-        "Urban": ("#4f4f4f", "#1f1f1f"),       # concrete realism
-        "Space": ("#0b0b2b", "#1c1c6b")        # deep navy cosmic
-    }
-    return terrains.get(terrain, ("#0aa1dd", "#0099cc"))
+    return TERRAIN_GRADIENTS.get(terrain, DEFAULT_GRADIENT)
 
 
-def blend_mode_and_terrain(mode, terrain):
-    terrain_base, terrain_tint = get_gradient_by_terrain(terrain)
-    mode_colours = {
-        "Cool Mode": ("#4ca1af", "#2c3e50"),        # calm blue-steel
-        "Heat Mode": ("#ff914d", "#ff5e00"),        # realistic heat orange
-        "Stealth Mode": ("#1e3c1f", "#2a5725"),     # dark camo green
-        "Alert Mode": ("#2b0000", "#ff0000"),       # darker, scarier red
-    }
-    mode_base, mode_tint = mode_colours.get(mode, ("#4ca1af", "#2c3e50"))
+def blend_hex(a, b):
+    # Average per channel; averaging the packed 24-bit ints let carries bleed between channels
+    ca = np.frombuffer(bytes.fromhex(a.lstrip("#")), dtype=np.uint8).astype(np.uint16)
+    cb = np.frombuffer(bytes.fromhex(b.lstrip("#")), dtype=np.uint8).astype(np.uint16)
+    return "#" + ((ca + cb) // 2).astype(np.uint8).tobytes().hex()
 
-    def blend_hex(a, b):
-        a, b = int(a.lstrip("#"), 16), int(b.lstrip("#"), 16)
-        avg = (a + b) // 2
-        return f"#{avg:06x}"
 
+def _blend(mode, terrain):
+    terrain_base, terrain_tint = get_gradient_by_terrain(terrain)
+    mode_base, mode_tint = MODE_COLOURS.get(mode, DEFAULT_MODE_COLOURS)
     return blend_hex(terrain_base, mode_base), blend_hex(terrain_tint, mode_tint)
 
 
-def render_visual(mode, terrain):
+# Every (mode, terrain) pair the UI can produce, blended once at import
+BLENDED = {(m, t): _blend(m, t) for m in MODE_COLOURS for t in TERRAIN_GRADIENTS}
+
+
+def blend_mode_and_terrain(mode, terrain):
+    return BLENDED.get((mode, terrain)) or _blend(mode, terrain)
+
+
+def _build_visual_html(mode, terrain):
     base, tint = blend_mode_and_terrain(mode, terrain)
 
     if mode == "Alert Mode":
@@ -230,22 +275,56 @@ def render_visual(mode, terrain):
         <span style='font-size:18px; opacity:0.85;'>({terrain} Terrain)</span>
     </div>
     """
+    return html
+
+
+# Every visual the UI can show, rendered once at import
+VISUAL_HTML = {(m, t): _build_visual_html(m, t) for m in MODE_COLOURS for t in TERRAIN_GRADIENTS}
+
+
+def render_visual(mode, terrain):
+    html = VISUAL_HTML.get((mode, terrain)) or _build_visual_html(mode, terrain)
     st.markdown(html, unsafe_allow_html=True)
 
 
-def export_csv(df):
-    csv = df.to_csv(index=False).encode("utf-8")
-    st.download_button("⬇️ Download CSV", csv, "session_data.csv", "text/csv")
+def vitals_figure():
+    """Return the session's trend figure, building its traces and layout on first use."""
+    if "vitals_fig" not in st.session_state:
+        fig = go.Figure()
+        fig.add_scatter(name="temp")
+        fig.add_scatter(name="heart", yaxis="y2")
+        fig.update_layout(
+            title="Temperature & Heart Rate Over Time",
+            template="plotly_dark",
+            yaxis=dict(title="°C"),
+            yaxis2=dict(title="BPM", overlaying="y", side="right"),
+        )
+        st.session_state.vitals_fig = fig
+    return st.session_state.vitals_fig
+
+
+def export_csv(history):
+    buf = pa.BufferOutputStream()
+    table = pa.table({
+        "timestamp": pa.array(history["timestamp"], type=pa.timestamp("us", tz="UTC")),
+        "temp": history["temp"] / 100,
+        "heart": history["heart"],
+        "light": history["light"] / 1000,
+        "mode": np.asarray(HISTORY_MODES)[history["mode"]],
+    })
+    pacsv.write_csv(table, buf)
+    st.download_button("⬇️ Download CSV", buf.getvalue().to_pybytes(), "session_data.csv", "text/csv")
+
+
+@st.cache_data(max_entries=16)
+def generate_qr_bytes(link):
+    buf = io.BytesIO()
+    segno.make_qr(link, error="l").save(buf, kind="png", scale=3, border=2, dark="black", light="white")
+    return buf.getvalue()
 
 
 def generate_qr(link):
-    qr = qrcode.QRCode(box_size=3, border=2)
-    qr.add_data(link)
-    qr.make(fit=True)
-    img = qr.make_image(fill_color="black", back_color="white")
-    buf = io.BytesIO()
-    img.save(buf, format="PNG")
-    st.image(buf.getvalue(), caption="Scan to open repo",)
+    st.image(generate_qr_bytes(link), caption="Scan to open repo",)
 
 
 def generate_metrics():
@@ -275,7 +354,7 @@ interval = st.sidebar.slider("Refresh Interval (s)", 1, 10, 3)
 st.sidebar.markdown("---")
 st.sidebar.subheader("Data Options")
 if st.sidebar.button("Export CSV"):
-    export_csv(st.session_state.history)
+    export_csv(history_view())
 
 st.sidebar.markdown("---")
 st.sidebar.subheader("GitHub Repo")
@@ -287,57 +366,63 @@ if st.sidebar.button("Show QR"):
 # MAIN UI
 # --------------------------------------------------
 st.markdown("<h1 class='main-title'>Smart Adaptive Camouflage Suit — Live Dashboard</h1>", unsafe_allow_html=True)
-placeholder = st.empty()
-
-while True:
-    temp, heart, light, mode = simulate_reading(scenario, terrain, oxygen, radiation, space_mode)
-    metrics = generate_metrics()
 
-    entry = {"timestamp": datetime.now(UTC).isoformat(), "temp": temp, "heart": heart, "light": light, "mode": mode}
-    new_row = pd.DataFrame([entry])
-    st.session_state.history = pd.concat([st.session_state.history, new_row], ignore_index=True).tail(300)
 
-    with placeholder.container():
-        col1, col2 = st.columns([1.2, 1])
-        with col1:
-            st.subheader("Adaptive Suit Visual")
-            st.caption(f"Mode: {mode} — Temp: {temp}°C | Heart: {heart} BPM | Light: {light}")
-            render_visual(mode, terrain)
-
-        with col2:
-            st.subheader("Physiological Metrics")
-            m1, m2, m3 = st.columns(3)
-            m1.metric("🧠 Core Temp", f"{metrics['Core Temp (°C)']} °C")
-            m2.metric("💓 Heart Rate", f"{metrics['Heart Rate (BPM)']} BPM")
-            m3.metric("🩸 SpO₂", f"{metrics['SpO₂ (%)']} %")
-
-            m4, m5, m6 = st.columns(3)
-            m4.metric("🌬️ Respiration", f"{metrics['Respiration Rate (/min)']} /min")
-            m5.metric("💧 Sweat Rate", f"{metrics['Sweat Rate (ml/h)']} ml/h")
-            m6.metric("🪖 Suit Pressure", f"{metrics['Suit Pressure (kPa)']} kPa")
-
-            m7, m8, m9 = st.columns(3)
-            m7.metric("🔋 Battery Health", f"{metrics['Battery Health (%)']} %")
-            m8.metric("☢️ Radiation", f"{metrics['Radiation Dose (mSv)']} mSv")
-            m9.metric("🌫️ Oxygen Level", f"{metrics['Oxygen Level (%)']} %")
+# Dashboard grid: rows of (metric key, card label, unit)
+METRIC_LAYOUT = (
+    (("Core Temp (°C)", "🧠 Core Temp", "°C"),
+     ("Heart Rate (BPM)", "💓 Heart Rate", "BPM"),
+     ("SpO₂ (%)", "🩸 SpO₂", "%")),
+    (("Respiration Rate (/min)", "🌬️ Respiration", "/min"),
+     ("Sweat Rate (ml/h)", "💧 Sweat Rate", "ml/h"),
+     ("Suit Pressure (kPa)", "🪖 Suit Pressure", "kPa")),
+    (("Battery Health (%)", "🔋 Battery Health", "%"),
+     ("Radiation Dose (mSv)", "☢️ Radiation", "mSv"),
+     ("Oxygen Level (%)", "🌫️ Oxygen Level", "%")),
+)
 
-            st.subheader("Vitals Trend")
-            df = st.session_state.history.copy()
-            if not df.empty:
-                df["temp"] = pd.to_numeric(df["temp"], errors="coerce")
-                df["heart"] = pd.to_numeric(df["heart"], errors="coerce")
-                fig = px.line(df, x="timestamp", y=["temp", "heart"], title="Temperature & Heart Rate Over Time")
-                st.plotly_chart(fig, use_container_width=True)
-            else:
-                st.info("No data yet.")
-    time.sleep(interval)
+# Static layout is emitted once per full run; the fragment only refills the slots
+col1, col2 = st.columns([1.2, 1])
+with col1:
+    st.subheader("Adaptive Suit Visual")
+    caption_slot = st.empty()
+    visual_slot = st.empty()
 
+with col2:
+    st.subheader("Physiological Metrics")
+    metric_slots = {}
+    for row in METRIC_LAYOUT:
+        for col, (key, label, unit) in zip(st.columns(len(row)), row):
+            metric_slots[key] = (col.empty(), label, unit)
 
+    st.subheader("Vitals Trend")
+    chart_slot = st.empty()
 
 
+@st.fragment(run_every=interval)
+def live_dashboard():
+    temp, heart, light, mode = simulate_reading(scenario, terrain, oxygen, radiation, space_mode)
+    metrics = generate_metrics()
 
+    record_reading(temp, heart, light, mode)
 
+    caption_slot.caption(f"Mode: {mode} — Temp: {temp}°C | Heart: {heart} BPM | Light: {light}")
+    with visual_slot:
+        render_visual(mode, terrain)
 
+    for key, (slot, label, unit) in metric_slots.items():
+        slot.metric(label, f"{metrics[key]} {unit}")
 
+    history = history_view()
+    with chart_slot:
+        if len(history):
+            fig = vitals_figure()
+            with fig.batch_update():
+                fig.data[0].x, fig.data[0].y = history["timestamp"], history["temp"] / 100
+                fig.data[1].x, fig.data[1].y = history["timestamp"], history["heart"]
+            st.plotly_chart(fig, use_container_width=True, theme=None)
+        else:
+            st.info("No data yet.")
 
 
+live_dashboard()
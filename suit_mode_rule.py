@@ -0,0 +1,14 @@
+import numpy as np
+
+# The synthetic labelling rule from train_model.py in closed form.
+# First matching condition wins: Alert > Stealth > Cool (hot) > Heat (cold)
+
+
+def predict(temp, heart, light):
+    """Label readings in one pass; scalars give a 0-d array, arrays an array of mode names."""
+    temp, heart, light = np.asarray(temp), np.asarray(heart), np.asarray(light)
+    return np.select(
+        [(heart > 130) | (temp > 42), light < 0.25, temp > 34, temp < 20],
+        ['Alert Mode', 'Stealth Mode', 'Cool Mode', 'Heat Mode'],
+        default='Cool Mode',
+    )
@@ -1,38 +1,37 @@
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 from sklearn.ensemble import RandomForestClassifier
+from sklearn.tree import DecisionTreeClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, confusion_matrix
 import joblib
 import os
+import argparse
+
+import suit_mode_rule
+
+parser = argparse.ArgumentParser(description='Train the suit mode classifiers on synthetic data.')
+parser.add_argument('--report', action='store_true', help='print classification reports and the confusion matrix')
+args = parser.parse_args()
 
 # Ensure folders exist
 os.makedirs('models', exist_ok=True)
 os.makedirs('data', exist_ok=True)
 
 # Generate synthetic data
-np.random.seed(42)
-rows = []
-for _ in range(2000):
-    temp = np.random.normal(35, 5) if np.random.rand() > 0.2 else np.random.normal(25, 3)
-    heart = int(np.random.normal(80, 15))
-    light = np.clip(np.random.beta(2, 2), 0, 1)
-
-    if heart > 130 or temp > 42:
-        mode = 'Alert Mode'
-    elif light < 0.25:
-        mode = 'Stealth Mode'
-    elif temp > 34:
-        mode = 'Cool Mode'
-    elif temp < 20:
-        mode = 'Heat Mode'
-    else:
-        mode = 'Cool Mode'
-
-    rows.append((temp, heart, light, mode))
+N = 2000
+rng = np.random.default_rng(42)
+temp = np.where(rng.random(N) > 0.2, rng.normal(35, 5, N), rng.normal(25, 3, N))
+heart = rng.normal(80, 15, N).astype(int)
+light = np.clip(rng.beta(2, 2, N), 0, 1)
+
+# Labels come from the closed-form rule the classifiers are trained to recover
+mode = suit_mode_rule.predict(temp, heart, light)
 
 # Create DataFrame
-df = pd.DataFrame(rows, columns=['temp', 'heart', 'light', 'mode'])
+df = pd.DataFrame({'temp': temp, 'heart': heart, 'light': light, 'mode': mode})
 X = df[['temp', 'heart', 'light']]
 y = df['mode']
 
@@ -40,14 +39,22 @@ y = df['mode']
 X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
 # Model training
-model = RandomForestClassifier(n_estimators=100, random_state=42)
+model = RandomForestClassifier(n_estimators=100, n_jobs=-1, random_state=42)
 model.fit(X_train, y_train)
 
+# Depth-limited surrogate: the labelling rule is only four thresholds deep,
+# so a single shallow tree matches the forest at a fraction of the predict cost
+lite_model = DecisionTreeClassifier(max_depth=4, random_state=42)
+lite_model.fit(X_train, y_train)
+
 # Evaluate
-y_pred = model.predict(X_test)
-print(classification_report(y_test, y_pred))
-print('Confusion matrix:\n', confusion_matrix(y_test, y_pred))
+if args.report:
+    y_pred = model.predict(X_test)
+    print(classification_report(y_test, y_pred))
+    print('Confusion matrix:\n', confusion_matrix(y_test, y_pred))
+    print('Lite model:\n', classification_report(y_test, lite_model.predict(X_test)))
 
 # Save model and data
-joblib.dump(model, 'models/suit_mode_rf.joblib')
-df.to_csv('data/synthetic_dataset.csv', index=False)
+joblib.dump(model, 'models/suit_mode_rf.joblib', compress=3, protocol=5)
+joblib.dump(lite_model, 'models/suit_mode_lite.joblib', compress=3, protocol=5)
+pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), 'data/synthetic_dataset.csv')